@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""Run several gcp_*.py scripts in one interpreter (gcp_test.py --isolated).
+
+argv[1] is a JSON list of [name, script, argv]; prints one JSON result line per test.
+"""
+import json
+import sys
+
+from gcp_test import run_script
+
+
+def main():
+    for name, script, argv in json.loads(sys.argv[1]):
+        rc, stderr = run_script(script, argv)
+        print(json.dumps({'name': name, 'rc': rc, 'stderr': stderr}), flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -109,21 +109,26 @@ def rollback(apply=False):
     status()
 
 
-parser = argparse.ArgumentParser(description='Audio tuning profiles (safe runtime)')
-sub = parser.add_subparsers(dest='cmd')
-sub.add_parser('status')
-p = sub.add_parser('profile')
-p.add_argument('name', choices=sorted(PROFILES.keys()))
-p.add_argument('--apply', action='store_true')
-r = sub.add_parser('rollback')
-r.add_argument('--apply', action='store_true')
-args = parser.parse_args()
-
-if args.cmd == 'status':
-    status()
-elif args.cmd == 'profile':
-    apply_profile(args.name, apply=args.apply)
-elif args.cmd == 'rollback':
-    rollback(apply=args.apply)
-else:
-    parser.print_help()
+def main():
+    parser = argparse.ArgumentParser(description='Audio tuning profiles (safe runtime)')
+    sub = parser.add_subparsers(dest='cmd')
+    sub.add_parser('status')
+    p = sub.add_parser('profile')
+    p.add_argument('name', choices=sorted(PROFILES.keys()))
+    p.add_argument('--apply', action='store_true')
+    r = sub.add_parser('rollback')
+    r.add_argument('--apply', action='store_true')
+    args = parser.parse_args()
+
+    if args.cmd == 'status':
+        status()
+    elif args.cmd == 'profile':
+        apply_profile(args.name, apply=args.apply)
+    elif args.cmd == 'rollback':
+        rollback(apply=args.apply)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
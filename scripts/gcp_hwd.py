@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Privileged hardware query helper (root, socket-activated).
+
+Serves read-only SMART queries over a Unix socket so gcp_predict.py does
+not need to spawn `sudo` (PAM, syslog, privilege switch) on every tick.
+"""
+import json
+import os
+import re
+import socket
+import subprocess
+import time
+
+SOCK_PATH = '/run/gcp-hwd.sock'
+CACHE_TTL = 60
+SD_LISTEN_FDS_START = 3
+
+# op -> (device name pattern, argv builder)
+OPS = {
+    'nvme_smart': (re.compile(r'nvme\d+'), lambda dev: ['nvme', 'smart-log', f'/dev/{dev}']),
+    'ssd_smart': (re.compile(r'sd[a-z]+'), lambda dev: ['smartctl', '-a', f'/dev/{dev}']),
+}
+
+_cache = {}
+
+
+def query(op, dev):
+    spec = OPS.get(op)
+    if not spec:
+        return {'error': f'unknown op: {op}'}
+    pattern, argv = spec
+    if not isinstance(dev, str) or not pattern.fullmatch(dev):
+        return {'error': f'invalid device: {dev}'}
+    # The socket is world-writable: never spawn a tool for a device that is not there
+    if not os.path.exists(f'/dev/{dev}'):
+        return {'rc': 1, 'out': '', 'error': f'no such device: /dev/{dev}'}
+
+    key = (op, dev)
+    hit = _cache.get(key)
+    now = time.monotonic()
+    if hit and now - hit[0] < CACHE_TTL:
+        return hit[1]
+
+    # Failures are cached for the same TTL, so repeating a bad query is cheap too
+    try:
+        p = subprocess.run(argv(dev), capture_output=True, text=True)
+        result = {'rc': p.returncode, 'out': (p.stdout or '').strip()}
+    except FileNotFoundError as e:
+        result = {'rc': 127, 'out': '', 'error': str(e)}
+    _cache[key] = (now, result)
+    return result
+
+
+def handle(conn):
+    with conn:
+        buf = b''
+        while b'\n' not in buf and len(buf) < 4096:
+            data = conn.recv(4096)
+            if not data:
+                break
+            buf += data
+        try:
+            msg = json.loads(buf.split(b'\n', 1)[0] or b'{}')
+            resp = query(msg.get('op'), msg.get('dev'))
+        except (ValueError, AttributeError) as e:
+            resp = {'error': str(e)}
+        conn.sendall(json.dumps(resp).encode() + b'\n')
+
+
+def listen_socket():
+    # Prefer the socket handed over by systemd (gcp-hwd.socket)
+    if os.environ.get('LISTEN_PID') == str(os.getpid()) and int(os.environ.get('LISTEN_FDS', '0')) >= 1:
+        return socket.socket(fileno=SD_LISTEN_FDS_START)
+    if os.path.exists(SOCK_PATH):
+        os.unlink(SOCK_PATH)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(SOCK_PATH)
+    os.chmod(SOCK_PATH, 0o666)
+    sock.listen(8)
+    return sock
+
+
+def main():
+    sock = listen_socket()
+    try:
+        while True:
+            conn, _ = sock.accept()
+            conn.settimeout(5)
+            try:
+                handle(conn)
+            except OSError:
+                pass
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
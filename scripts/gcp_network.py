@@ -149,21 +149,26 @@ def rollback(apply=False):
     show_status()
 
 
-parser = argparse.ArgumentParser(description='Network DNS profile manager (safe-ish, reversible)')
-sub = parser.add_subparsers(dest='cmd')
-sub.add_parser('status')
-p = sub.add_parser('profile')
-p.add_argument('name', choices=sorted(DNS_PROFILES.keys()))
-p.add_argument('--apply', action='store_true')
-r = sub.add_parser('rollback')
-r.add_argument('--apply', action='store_true')
-args = parser.parse_args()
-
-if args.cmd == 'status':
-    show_status()
-elif args.cmd == 'profile':
-    apply_profile(args.name, apply=args.apply)
-elif args.cmd == 'rollback':
-    rollback(apply=args.apply)
-else:
-    parser.print_help()
+def main():
+    parser = argparse.ArgumentParser(description='Network DNS profile manager (safe-ish, reversible)')
+    sub = parser.add_subparsers(dest='cmd')
+    sub.add_parser('status')
+    p = sub.add_parser('profile')
+    p.add_argument('name', choices=sorted(DNS_PROFILES.keys()))
+    p.add_argument('--apply', action='store_true')
+    r = sub.add_parser('rollback')
+    r.add_argument('--apply', action='store_true')
+    args = parser.parse_args()
+
+    if args.cmd == 'status':
+        show_status()
+    elif args.cmd == 'profile':
+        apply_profile(args.name, apply=args.apply)
+    elif args.cmd == 'rollback':
+        rollback(apply=args.apply)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
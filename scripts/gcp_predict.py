@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
-import argparse
+import atexit
 import json
+import os
 import re
 import shutil
+import socket
 import subprocess
+import sys
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 HOME = Path.home()
@@ -12,14 +16,43 @@ BASE = HOME / '.local' / 'share' / 'ghost-control-plane'
 PREDICT_DIR = BASE / 'predictive'
 PREDICT_DIR.mkdir(parents=True, exist_ok=True)
 HISTORY_FILE = PREDICT_DIR / 'hardware_history.jsonl'
+HWD_SOCK = '/run/gcp-hwd.sock'
+_HIST_FH = None
 
 def run(cmd):
     p = subprocess.run(cmd, capture_output=True, text=True)
     return p.returncode, (p.stdout or '').strip(), (p.stderr or '').strip()
 
+def hwd_query(op, device):
+    """Ask the gcp-hwd helper for cached SMART output; None if it is not running"""
+    if not Path(HWD_SOCK).exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    try:
+        sock.connect(HWD_SOCK)
+        sock.sendall(json.dumps({'op': op, 'dev': device}).encode() + b'\n')
+        buf = b''
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            buf += data
+        resp = json.loads(buf)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if 'rc' not in resp:
+        return None
+    return resp['rc'], resp.get('out', '')
+
 def get_nvme_smart(device='nvme0'):
     """Get NVMe SMART data"""
-    rc, out, _ = run(['sudo', '-n', 'nvme', 'smart-log', f'/dev/{device}'])
+    res = hwd_query('nvme_smart', device)
+    if res is None:
+        res = run(['sudo', '-n', 'nvme', 'smart-log', f'/dev/{device}'])[:2]
+    rc, out = res
     if rc != 0:
         return {}
     
@@ -40,7 +73,10 @@ def get_ssd_smart(device='sda'):
     if not shutil.which('smartctl'):
         return {}
     
-    rc, out, _ = run(['sudo', '-n', 'smartctl', '-a', f'/dev/{device}'])
+    res = hwd_query('ssd_smart', device)
+    if res is None:
+        res = run(['sudo', '-n', 'smartctl', '-a', f'/dev/{device}'])[:2]
+    rc, out = res
     if rc not in [0, 4]:  # 4 is SMART failing but data available
         return {}
     
@@ -89,10 +125,18 @@ def collect_snapshot():
     }
     return snapshot
 
+def _close_history():
+    if _HIST_FH is not None:
+        os.fsync(_HIST_FH.fileno())
+        _HIST_FH.close()
+
 def save_history(snapshot):
-    """Append to historical data"""
-    with open(HISTORY_FILE, 'a') as f:
-        f.write(json.dumps(snapshot) + '\n')
+    """Append to historical data (handle is kept open for the process lifetime)"""
+    global _HIST_FH
+    if _HIST_FH is None:
+        _HIST_FH = open(HISTORY_FILE, 'ab', buffering=0)
+        atexit.register(_close_history)
+    _HIST_FH.write(json.dumps(snapshot).encode() + b'\n')
 
 def load_history(days=30):
     """Load historical data for analysis"""
@@ -101,20 +145,28 @@ def load_history(days=30):
         return history
     
     cutoff = datetime.now().timestamp() - (days * 24 * 3600)
+    # Timestamps are naive local isoformat strings, so they order lexicographically
+    cutoff_iso = datetime.fromtimestamp(cutoff).isoformat()
     
     with open(HISTORY_FILE) as f:
         for ln in f:
             try:
                 entry = json.loads(ln)
-                # Parse timestamp
-                ts = datetime.fromisoformat(entry['timestamp'])
-                if ts.timestamp() > cutoff:
-                    history.append(entry)
-            except:
-                pass
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            ts = entry.get('timestamp')
+            if not isinstance(ts, str) or not ts or ts <= cutoff_iso:
+                continue
+            history.append(entry)
     
     return history
 
+def cpu_temps(entries, n):
+    """First n CPU temps from entries that have a temps reading"""
+    return list(islice((h['temps'].get('cpu', 0) for h in entries if h.get('temps')), n))
+
 def analyze_trends(history):
     """Simple trend analysis for failure prediction"""
     if len(history) < 3:
@@ -142,10 +194,13 @@ def analyze_trends(history):
             })
     
     # Temperature trends
-    temps = [h['temps'].get('cpu', 0) for h in history if h.get('temps')]
-    if len(temps) >= 3:
-        avg_recent = sum(temps[-3:]) / 3
-        avg_old = sum(temps[:3]) / 3 if len(temps) >= 6 else avg_recent
+    # Only the first and last three samples are compared; reading six from the
+    # front is enough to know whether there are at least six in total
+    head = cpu_temps(history, 6)
+    tail = cpu_temps(reversed(history), 3)[::-1]
+    if len(tail) >= 3:
+        avg_recent = sum(tail) / 3
+        avg_old = sum(head[:3]) / 3 if len(head) >= 6 else avg_recent
         
         if avg_recent > avg_old + 10:
             alerts.append({
@@ -233,7 +288,24 @@ def status():
     
     return 0 if health_score > 80 else 1
 
+def collect():
+    snap = collect_snapshot()
+    save_history(snap)
+    print('snapshot collected')
+    return 0
+
+COMMANDS = {
+    'predict': predict,
+    'status': status,
+    'collect': collect,
+}
+
 def main():
+    # Fast path for timer invocations: skip building the argparse parser
+    if len(sys.argv) == 2 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]]()
+
+    import argparse
     parser = argparse.ArgumentParser(description='Predictive hardware failure detection')
     sub = parser.add_subparsers(dest='cmd')
     
@@ -243,15 +315,8 @@ def main():
     
     args = parser.parse_args()
     
-    if args.cmd == 'predict':
-        return predict()
-    elif args.cmd == 'status':
-        return status()
-    elif args.cmd == 'collect':
-        snap = collect_snapshot()
-        save_history(snap)
-        print('snapshot collected')
-        return 0
+    if args.cmd in COMMANDS:
+        return COMMANDS[args.cmd]()
     else:
         parser.print_help()
         return 1
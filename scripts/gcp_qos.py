@@ -8,6 +8,31 @@ STATE = ROOT / 'state'
 STATE.mkdir(parents=True, exist_ok=True)
 LAST = STATE / 'network-qos-last.json'
 
+# fq_codel tuning profiles
+QOS_PROFILES = {
+    'default': {
+        'target': '5ms',
+        'interval': '100ms',
+        'quantum': '1514',
+        'flows': '1024',
+        'limit': '10240',
+    },
+    'gaming': {
+        'target': '3ms',
+        'interval': '50ms',
+        'quantum': '1514',
+        'flows': '2048',
+        'limit': '8192',
+    },
+    'streaming': {
+        'target': '4ms',
+        'interval': '80ms',
+        'quantum': '1514',
+        'flows': '1024',
+        'limit': '12288',
+    },
+}
+
 
 def run(cmd):
     p = subprocess.run(cmd, capture_output=True, text=True)
@@ -45,32 +70,7 @@ def get_current_qdisc(iface):
 
 
 def apply_qos(iface, profile, apply=False):
-    # fq_codel tuning profiles
-    profiles = {
-        'default': {
-            'target': '5ms',
-            'interval': '100ms',
-            'quantum': '1514',
-            'flows': '1024',
-            'limit': '10240',
-        },
-        'gaming': {
-            'target': '3ms',
-            'interval': '50ms',
-            'quantum': '1514',
-            'flows': '2048',
-            'limit': '8192',
-        },
-        'streaming': {
-            'target': '4ms',
-            'interval': '80ms',
-            'quantum': '1514',
-            'flows': '1024',
-            'limit': '12288',
-        },
-    }
-
-    p = profiles.get(profile, profiles['default'])
+    p = QOS_PROFILES.get(profile, QOS_PROFILES['default'])
     current = get_current_qdisc(iface)
 
     print(f'iface={iface}')
@@ -121,7 +121,7 @@ parser = argparse.ArgumentParser(description='Network QoS tuning (fq_codel)')
 sub = parser.add_subparsers(dest='cmd')
 sub.add_parser('status')
 p = sub.add_parser('apply')
-p.add_argument('profile', choices=['default', 'gaming', 'streaming'])
+p.add_argument('profile', choices=sorted(QOS_PROFILES.keys()))
 p.add_argument('--apply', action='store_true')
 p.add_argument('--iface')
 sub.add_parser('rollback')
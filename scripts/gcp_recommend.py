@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 import argparse
+import heapq
 import json
+import os
 from pathlib import Path
 
 BASE = Path.home() / '.local' / 'share' / 'ghost-control-plane' / 'snapshots'
 
 
 def load_recent(n):
-    files = sorted(BASE.glob('*.json'))[-n:]
+    if not BASE.is_dir():
+        return [], []
+    # Snapshot names are timestamps, so the newest n are the n largest names
+    with os.scandir(BASE) as it:
+        top = heapq.nlargest(n, (e.name for e in it if e.name.endswith('.json')))
+    files = [BASE / name for name in sorted(top)]
     data = []
     for f in files:
         try:
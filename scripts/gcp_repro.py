@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 import argparse
+import functools
 import hashlib
 import json
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -30,10 +33,51 @@ def run(cmd):
     return p.returncode, (p.stdout or '').strip(), (p.stderr or '').strip()
 
 
+def systemctl_units(verb, units):
+    """One `systemctl --user <verb>` for all units; per unit if that fails (e.g. a missing unit file)"""
+    res = run(['systemctl', '--user', verb, *units])
+    if res[0] == 0 or len(units) < 2:
+        return res
+    # A batched call is all-or-nothing; retry so the other units still get applied
+    results = [run(['systemctl', '--user', verb, u]) for u in units]
+    return next((r for r in results if r[0] != 0), results[0])
+
+
+def timer_states(units):
+    """{unit: {'enabled': UnitFileState, 'active': ActiveState}} from one systemctl call."""
+    states = {u: {'enabled': 'disabled', 'active': 'inactive'} for u in units}
+    if not units:
+        return states
+    rc, out, _ = run(['systemctl', '--user', 'show', '-p', 'Id', '-p', 'UnitFileState', '-p', 'ActiveState', '--'] + list(units))
+    if rc != 0:
+        return states
+    # One blank-line-separated key=value block per unit
+    for block in out.split('\n\n'):
+        props = dict(ln.split('=', 1) for ln in block.splitlines() if '=' in ln)
+        unit = props.get('Id')
+        if unit in states:
+            states[unit] = {
+                'enabled': props.get('UnitFileState') or 'disabled',
+                'active': props.get('ActiveState') or 'inactive',
+            }
+    return states
+
+
 def sha256(path: Path):
-    h = hashlib.sha256()
-    h.update(path.read_bytes())
-    return h.hexdigest()
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        h = hashlib.sha256()
+        while chunk := f.read(1 << 16):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def files_equal(a: Path, b: Path):
+    # Size check first; only hash when sizes match (the common unchanged case)
+    if a.stat().st_size != b.stat().st_size:
+        return False
+    return sha256(a) == sha256(b)
 
 
 def pp_cmd(args):
@@ -48,27 +92,29 @@ def export_manifest():
 
     timers = {}
     units = {}
+    states = timer_states([u for u in USER_UNITS if u.endswith('.timer')])
     for unit in USER_UNITS:
         upath = CFG_USER / unit
         timers[unit] = {}
-        if unit.endswith('.timer'):
-            rc1, en, _ = run(['systemctl', '--user', 'is-enabled', unit])
-            rc2, ac, _ = run(['systemctl', '--user', 'is-active', unit])
-            timers[unit] = {
-                'enabled': en if rc1 == 0 else 'disabled',
-                'active': ac if rc2 == 0 else 'inactive',
-            }
+        if unit in states:
+            timers[unit] = states[unit]
         if upath.exists():
             target = UNITS_DIR / unit
             target.write_text(upath.read_text())
             units[unit] = {
                 'present': True,
-                'sha256': sha256(target),
+                'sha256': None,
                 'source': str(target),
             }
         else:
             units[unit] = {'present': False}
 
+    # hashlib releases the GIL while hashing, so the digests run in parallel
+    present = [u for u, meta in units.items() if meta['present']]
+    with ThreadPoolExecutor() as ex:
+        for unit, digest in zip(present, ex.map(sha256, [UNITS_DIR / u for u in present])):
+            units[unit]['sha256'] = digest
+
     manifest = {
         'version': 1,
         'generated_at': datetime.now().isoformat(),
@@ -80,11 +126,18 @@ def export_manifest():
     print(f'exported={MANIFEST}')
 
 
+@functools.lru_cache(maxsize=8)
+def parse_manifest(path, mtime_ns, size):
+    # mtime_ns/size are only part of the cache key: an edited file re-parses
+    return json.loads(Path(path).read_text())
+
+
 def load_manifest(path=None):
     p = Path(path) if path else MANIFEST
     if not p.exists():
         raise SystemExit(f'manifest missing: {p}')
-    return json.loads(p.read_text())
+    st = p.stat()
+    return parse_manifest(str(p), st.st_mtime_ns, st.st_size)
 
 
 def apply_manifest(path=None, apply=False):
@@ -96,28 +149,32 @@ def apply_manifest(path=None, apply=False):
         src = UNITS_DIR / unit
         dst = CFG_USER / unit
         if meta.get('present') and src.exists():
-            need = (not dst.exists()) or (dst.read_text() != src.read_text())
+            need = (not dst.exists()) or not files_equal(src, dst)
             if need:
                 print(f'plan: sync unit {unit}')
                 if apply:
                     dst.parent.mkdir(parents=True, exist_ok=True)
-                    dst.write_text(src.read_text())
+                    shutil.copyfile(src, dst)
         elif not meta.get('present') and dst.exists():
             print(f'plan: keep existing extra unit {unit} (no deletion)')
 
     if apply:
         run(['systemctl', '--user', 'daemon-reload'])
 
-    # Timer states
+    # Timer states, batched into one systemctl call per verb
+    verbs = {'enable': [], 'disable': [], 'start': [], 'stop': []}
     for unit, st in m.get('timers', {}).items():
         if not unit.endswith('.timer'):
             continue
         want_en = st.get('enabled') == 'enabled'
         want_ac = st.get('active') == 'active'
         print(f'plan: {unit} enabled={want_en} active={want_ac}')
-        if apply:
-            run(['systemctl', '--user', 'enable' if want_en else 'disable', unit])
-            run(['systemctl', '--user', 'start' if want_ac else 'stop', unit])
+        verbs['enable' if want_en else 'disable'].append(unit)
+        verbs['start' if want_ac else 'stop'].append(unit)
+    if apply:
+        for verb, units in verbs.items():
+            if units:
+                systemctl_units(verb, units)
 
     # Power profile
     pp = m.get('power_profile')
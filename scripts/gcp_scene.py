@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import argparse
-import subprocess
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent
@@ -40,11 +39,6 @@ SCENES = {
 }
 
 
-def run(cmd):
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    return p.returncode, (p.stdout or '').strip(), (p.stderr or '').strip()
-
-
 parser = argparse.ArgumentParser(description='Ghost scene switcher (safe)')
 parser.add_argument('--list', action='store_true', help='list scenes')
 parser.add_argument('--scene', choices=sorted(SCENES.keys()))
@@ -60,49 +54,28 @@ if not args.scene:
     parser.error('--scene is required unless --list is used')
 
 s = SCENES[args.scene]
-cmd = [
-    'python', str(PROFILE),
-    '--profile', s['profile'],
-    '--verify-seconds', str(s['verify']),
-]
-mode = 'dry-run'
-if args.apply and not args.dry_run:
-    cmd.append('--apply')
-    mode = 'apply'
-else:
-    cmd.append('--dry-run')
+apply = args.apply and not args.dry_run
+mode = 'apply' if apply else 'dry-run'
 
 print(f"Scene: {args.scene} ({mode})")
-print('Power plan: ' + ' '.join(cmd))
-print(f"Audio plan: python {ROOT / 'gcp_audio.py'} profile {s['audio']} {'--apply' if mode == 'apply' else ''}".strip())
-print(f"Network plan: python {ROOT / 'gcp_network.py'} profile {s['network']} {'--apply' if mode == 'apply' else ''}".strip())
+# The steps run in-process, but the plan shows the equivalent CLI commands
+# so a dry-run can be copied and run by hand
+print(f"Power plan: python {PROFILE} --profile {s['profile']} --verify-seconds {s['verify']} {'--apply' if apply else '--dry-run'}")
+print(f"Audio plan: python {ROOT / 'gcp_audio.py'} profile {s['audio']} {'--apply' if apply else ''}".strip())
+print(f"Network plan: python {ROOT / 'gcp_network.py'} profile {s['network']} {'--apply' if apply else ''}".strip())
 
 if mode == 'apply':
+    # Steps run in-process (no interpreter per step); a failing step raises
+    # SystemExit and stops the scene before the next one, as before.
+    import gcp_audio
+    import gcp_network
+    import gcp_profile
+
     # 1) power profile with safety checks/rollback
-    rc, out, err = run(cmd)
-    if out:
-        print(out)
-    if err:
-        print(err)
-    if rc != 0:
-        raise SystemExit(rc)
+    gcp_profile.apply_profile(s['profile'], verify_seconds=s['verify'], apply=True)
 
     # 2) audio profile (safe runtime)
-    a_cmd = ['python', str(ROOT / 'gcp_audio.py'), 'profile', s['audio'], '--apply']
-    rc, out, err = run(a_cmd)
-    if out:
-        print(out)
-    if err:
-        print(err)
-    if rc != 0:
-        raise SystemExit(rc)
+    gcp_audio.apply_profile(s['audio'], apply=True)
 
     # 3) network profile (reversible)
-    n_cmd = ['python', str(ROOT / 'gcp_network.py'), 'profile', s['network'], '--apply']
-    rc, out, err = run(n_cmd)
-    if out:
-        print(out)
-    if err:
-        print(err)
-    if rc != 0:
-        raise SystemExit(rc)
+    gcp_network.apply_profile(s['network'], apply=True)
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import os
+import shutil
 import stat
 import subprocess
 from pathlib import Path
@@ -19,6 +21,36 @@ def run(cmd):
     return p.returncode, (p.stdout or '').strip(), (p.stderr or '').strip()
 
 
+def systemctl_units(verb, units):
+    """One `systemctl --user <verb>` for all units; per unit if that fails (e.g. a missing unit file)"""
+    res = run(['systemctl', '--user', verb, *units])
+    if res[0] == 0 or len(units) < 2:
+        return res
+    # A batched call is all-or-nothing; retry so the other units still get applied
+    results = [run(['systemctl', '--user', verb, u]) for u in units]
+    return next((r for r in results if r[0] != 0), results[0])
+
+
+def timer_states(units):
+    """{unit: {'enabled': UnitFileState, 'active': ActiveState}} from one systemctl call."""
+    states = {u: {'enabled': 'disabled', 'active': 'inactive'} for u in units}
+    if not units:
+        return states
+    rc, out, _ = run(['systemctl', '--user', 'show', '-p', 'Id', '-p', 'UnitFileState', '-p', 'ActiveState', '--'] + list(units))
+    if rc != 0:
+        return states
+    # One blank-line-separated key=value block per unit
+    for block in out.split('\n\n'):
+        props = dict(ln.split('=', 1) for ln in block.splitlines() if '=' in ln)
+        unit = props.get('Id')
+        if unit in states:
+            states[unit] = {
+                'enabled': props.get('UnitFileState') or 'disabled',
+                'active': props.get('ActiveState') or 'inactive',
+            }
+    return states
+
+
 def is_exec(path: Path):
     return bool(path.stat().st_mode & stat.S_IXUSR)
 
@@ -28,10 +60,51 @@ def ensure_exec(path: Path):
     path.chmod(mode | stat.S_IXUSR)
 
 
+def file_digest(path: Path):
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'blake2b').digest()
+        h = hashlib.blake2b()
+        while chunk := f.read(1 << 16):
+            h.update(chunk)
+        return h.digest()
+
+
+def files_equal(a: Path, b: Path):
+    # Size check first; only hash when sizes match (the common unchanged case)
+    if a.stat().st_size != b.stat().st_size:
+        return False
+    return file_digest(a) == file_digest(b)
+
+
+def sync_unit(src: Path, dst: Path):
+    # Re-check at apply time: the unit may have been fixed since evaluate()
+    if dst.exists() and files_equal(src, dst):
+        return False
+    shutil.copyfile(src, dst)
+    return True
+
+
 def add_action(actions, kind, desc, fn):
     actions.append({'kind': kind, 'desc': desc, 'fn': fn})
 
 
+def apply_action(a):
+    """Run one action and print its outcome; returns the action's result"""
+    try:
+        r = a['fn']()
+    except Exception as e:
+        print(f'apply [{a["kind"]}] error={e} :: {a["desc"]}')
+        return None
+    if a['kind'] == 'sync-unit':
+        print(f'apply [{a["kind"]}] {"synced" if r else "unchanged"} :: {a["desc"]}')
+    elif isinstance(r, tuple):
+        print(f'apply [{a["kind"]}] rc={r[0]} :: {a["desc"]}')
+    else:
+        print(f'apply [{a["kind"]}] ok :: {a["desc"]}')
+    return r
+
+
 def evaluate():
     actions = []
 
@@ -48,17 +121,17 @@ def evaluate():
     for unit in TIMER_UNITS + ['gcp-snapshot.service', 'gcp-autopilot.service', 'gcp-selfheal.service', 'gcp-soc-report.service', 'gcp-mesh-ops.service', 'gcp-backup.service']:
         dst = CFG_USER / unit
         src = ROOT.parent / 'systemd' / 'user' / unit
-        if src.exists() and (not dst.exists() or dst.read_text() != src.read_text()):
-            add_action(actions, 'sync-unit', f'Sync unit: {unit}', lambda src=src, dst=dst: dst.write_text(src.read_text()))
-
-    # timer enable/start checks
-    for t in TIMER_UNITS:
-        rc_en, en, _ = run(['systemctl', '--user', 'is-enabled', t])
-        rc_ac, ac, _ = run(['systemctl', '--user', 'is-active', t])
-        if rc_en != 0 or en != 'enabled':
-            add_action(actions, 'enable-timer', f'Enable timer: {t}', lambda t=t: run(['systemctl', '--user', 'enable', t]))
-        if rc_ac != 0 or ac != 'active':
-            add_action(actions, 'start-timer', f'Start timer: {t}', lambda t=t: run(['systemctl', '--user', 'start', t]))
+        if src.exists() and (not dst.exists() or not files_equal(src, dst)):
+            add_action(actions, 'sync-unit', f'Sync unit: {unit}', lambda src=src, dst=dst: sync_unit(src, dst))
+
+    # timer enable/start checks, one systemctl call per verb
+    states = timer_states(TIMER_UNITS)
+    to_enable = [t for t, st in states.items() if st['enabled'] != 'enabled']
+    to_start = [t for t, st in states.items() if st['active'] != 'active']
+    if to_enable:
+        add_action(actions, 'enable-timer', f'Enable timers: {", ".join(to_enable)}', lambda: systemctl_units('enable', to_enable))
+    if to_start:
+        add_action(actions, 'start-timer', f'Start timers: {", ".join(to_start)}', lambda: systemctl_units('start', to_start))
 
     return actions
 
@@ -86,17 +159,16 @@ if mode == 'apply':
     if err:
         print(err)
 
-    # Reload user daemon once if any units changed
-    if any(a['kind'] == 'sync-unit' for a in actions):
+    # Create dirs and fix modes, sync unit files, reload the user daemon once
+    # if any unit changed, then run the timer actions against the reloaded units.
+    for a in actions:
+        if a['kind'] in ('mkdir', 'chmod'):
+            apply_action(a)
+    syncs = [a for a in actions if a['kind'] == 'sync-unit']
+    changed = sum(bool(apply_action(a)) for a in syncs)
+    if changed:
         run(['systemctl', '--user', 'daemon-reload'])
-
+        print(f'daemon-reload units_changed={changed}')
     for a in actions:
-        try:
-            r = a['fn']()
-            if isinstance(r, tuple):
-                rc = r[0]
-                print(f'apply [{a["kind"]}] rc={rc} :: {a["desc"]}')
-            else:
-                print(f'apply [{a["kind"]}] ok :: {a["desc"]}')
-        except Exception as e:
-            print(f'apply [{a["kind"]}] error={e} :: {a["desc"]}')
+        if a['kind'] not in ('mkdir', 'chmod', 'sync-unit'):
+            apply_action(a)
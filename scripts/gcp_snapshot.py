@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import asyncio
 import json
 import os
 import re
@@ -6,6 +7,11 @@ import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson  # optional, faster encoder for large sensors/analyze dumps
+except ImportError:
+    orjson = None
+
 BASE = Path.home() / '.local' / 'share' / 'ghost-control-plane'
 SNAP = BASE / 'snapshots'
 BASE.mkdir(parents=True, exist_ok=True)
@@ -20,6 +26,38 @@ def run(cmd):
         return (1, '', str(e))
 
 
+async def run_async(cmd):
+    try:
+        p = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        out, err = await p.communicate()
+        return (p.returncode, out.decode(errors='replace').strip(), err.decode(errors='replace').strip())
+    except Exception as e:
+        return (1, '', str(e))
+
+
+# Independent probes, spawned concurrently so the snapshot costs max() not sum() of their latencies
+PROBES = {
+    'uptime': ['uptime'],
+    'free': ['free', '-b'],
+    'swapon': ['swapon', '--show', '--bytes'],
+    'systemd_analyze': ['systemd-analyze'],
+    'failed': ['systemctl', '--failed', '--no-legend'],
+    'journal': ['journalctl', '--quiet', '--output=cat', '--since', '15 min ago', '-p', '0..3', '--no-pager'],
+    'sensors': ['sensors'],
+    'nvidia': [
+        'nvidia-smi',
+        '--query-gpu=temperature.gpu,utilization.gpu,memory.used,memory.total,pstate,power.draw',
+        '--format=csv,noheader,nounits'
+    ],
+}
+
+
+async def collect():
+    results = await asyncio.gather(*(run_async(cmd) for cmd in PROBES.values()))
+    return dict(zip(PROBES, results))
+
+
 def first_float(text):
     m = re.search(r'(-?\d+(?:\.\d+)?)', text or '')
     return float(m.group(1)) if m else None
@@ -30,13 +68,14 @@ snapshot = {
     'host': os.uname().nodename,
     'kernel': os.uname().release,
 }
+probes = asyncio.run(collect())
 
 # uptime/load
-rc, out, _ = run(['uptime'])
+rc, out, _ = probes['uptime']
 snapshot['uptime'] = out if rc == 0 else None
 
 # memory
-rc, out, _ = run(['free', '-b'])
+rc, out, _ = probes['free']
 if rc == 0 and out:
     lines = out.splitlines()
     mem = [ln for ln in lines if ln.startswith('Mem:')]
@@ -52,7 +91,7 @@ if rc == 0 and out:
             }
 
 # swap
-rc, out, _ = run(['swapon', '--show', '--bytes'])
+rc, out, _ = probes['swapon']
 snapshot['swap'] = out if rc == 0 else None
 
 # CPU policy
@@ -67,24 +106,26 @@ for key, path in {
         snapshot[key] = None
 
 # boot/userspace timing
-rc, out, _ = run(['systemd-analyze'])
+rc, out, _ = probes['systemd_analyze']
 snapshot['systemd_analyze'] = out if rc == 0 else None
 if out:
     m = re.search(r'\+\s*([0-9.]+)s \(userspace\)', out)
     snapshot['userspace_sec'] = float(m.group(1)) if m else None
 
 # failed units count
-rc, out, _ = run(['systemctl', '--failed', '--no-legend'])
+rc, out, _ = probes['failed']
 if rc == 0:
-    snapshot['failed_units'] = len([ln for ln in out.splitlines() if ln.strip()])
+    snapshot['failed_units'] = sum(1 for ln in out.splitlines() if ln.strip())
 
 # journal errors last 15m
-rc, out, _ = run(['journalctl', '--since', '15 min ago', '-p', '0..3', '--no-pager'])
+rc, out, _ = probes['journal']
 if rc == 0:
-    snapshot['errors_last_15m'] = len([ln for ln in out.splitlines() if ln.strip() and not ln.startswith('--')])
+    # --quiet --output=cat emits one line per entry and no '-- ... --' headers;
+    # out is stripped, so the last entry has no trailing newline
+    snapshot['errors_last_15m'] = out.count('\n') + 1 if out else 0
 
 # sensors (best effort)
-rc, out, _ = run(['sensors'])
+rc, out, _ = probes['sensors']
 if rc == 0:
     snapshot['sensors_raw'] = out
     cpu_temp = None
@@ -98,15 +139,18 @@ if rc == 0:
     snapshot['nvme_temp_c'] = nvme_temp
 
 # nvidia (best effort)
-rc, out, _ = run([
-    'nvidia-smi',
-    '--query-gpu=temperature.gpu,utilization.gpu,memory.used,memory.total,pstate,power.draw',
-    '--format=csv,noheader,nounits'
-])
+rc, out, _ = probes['nvidia']
 if rc == 0 and out:
     snapshot['nvidia_raw'] = out
 
-name = datetime.now().strftime('%Y%m%d-%H%M%S') + '.json'
+# Microseconds + pid keep same-second snapshots (e.g. autopilot bursts) from
+# overwriting each other; the timestamp prefix still sorts chronologically
+name = datetime.now().strftime('%Y%m%d-%H%M%S-%f') + f'_{os.getpid()}.json'
 path = SNAP / name
-path.write_text(json.dumps(snapshot, indent=2))
+# orjson writes non-ASCII (e.g. the °C in sensors output) as raw UTF-8 where
+# json.dumps escapes it, so files differ in bytes but parse to the same data
+if orjson:
+    path.write_bytes(orjson.dumps(snapshot, option=orjson.OPT_INDENT_2))
+else:
+    path.write_text(json.dumps(snapshot, indent=2))
 print(str(path))
@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import os
+import re
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson  # optional: C encoder, several times faster on large snapshots
+except ImportError:
+    orjson = None
+
 BASE = Path.home() / '.local' / 'share' / 'ghost-control-plane' / 'soc'
 SNAP = BASE / 'snapshots'
 BASE.mkdir(parents=True, exist_ok=True)
@@ -13,6 +21,7 @@ SNAP.mkdir(parents=True, exist_ok=True)
 BASELINE = BASE / 'baseline.json'
 
 SVC_PATTERNS = ('ssh', 'sshd', 'docker', 'libvirtd', 'avahi', 'bluetooth', 'openclaw')
+SVC_RE = re.compile('|'.join(map(re.escape, SVC_PATTERNS)), re.IGNORECASE)
 
 
 def run(cmd):
@@ -49,41 +58,49 @@ def parse_ufw_rules(text):
 
 
 def service_slice(text):
-    out = []
-    for ln in (text or '').splitlines():
-        low = ln.lower()
-        if any(p in low for p in SVC_PATTERNS):
-            out.append(ln)
-    return out
+    return [ln for ln in (text or '').splitlines() if SVC_RE.search(ln)]
 
 
-def package_updates():
-    updates = {'pacman_updates': [], 'aur_updates': [], 'brew_updates': [], 'apt_updates': [], 'dnf_updates': []}
+PKG_MANAGERS = (
+    ('pacman_updates', ['pacman', '-Qu']),
+    ('aur_updates', ['paru', '-Qua']),
+    ('brew_updates', ['brew', 'outdated']),
+    # Read-only: simulate upgrade list
+    ('apt_updates', ['apt', 'list', '--upgradable']),
+    ('dnf_updates', ['dnf', 'check-update']),
+)
 
-    if shutil.which('pacman'):
-        rc, out, _ = run(['pacman', '-Qu'])
-        updates['pacman_updates'] = [ln for ln in out.splitlines() if ln.strip()] if rc == 0 else []
 
-    if shutil.which('paru'):
-        rc, out, _ = run(['paru', '-Qua'])
-        updates['aur_updates'] = [ln for ln in out.splitlines() if ln.strip()] if rc == 0 else []
+def run_all(cmds):
+    """Run independent commands concurrently; results keep the input order."""
+    if not cmds:
+        return []
+    with ThreadPoolExecutor(max_workers=len(cmds)) as ex:
+        return list(ex.map(run, cmds))
 
-    if shutil.which('brew'):
-        rc, out, _ = run(['brew', 'outdated'])
-        updates['brew_updates'] = [ln for ln in out.splitlines() if ln.strip()] if rc == 0 else []
 
-    if shutil.which('apt'):
-        # Read-only: simulate upgrade list
-        rc, out, _ = run(['apt', 'list', '--upgradable'])
-        if rc == 0:
-            updates['apt_updates'] = [ln for ln in out.splitlines()[1:] if ln.strip()]
+def package_update_cmds():
+    return [(key, cmd) for key, cmd in PKG_MANAGERS if shutil.which(cmd[0])]
 
-    if shutil.which('dnf'):
-        rc, out, _ = run(['dnf', 'check-update'])
-        # dnf returns 100 when updates are available
-        if rc in (0, 100):
-            updates['dnf_updates'] = [ln for ln in out.splitlines() if ln.strip() and not ln.startswith('Last metadata')]
 
+def parse_package_updates(key, rc, out):
+    lines = out.splitlines()
+    if key == 'apt_updates':
+        return [ln for ln in lines[1:] if ln.strip()] if rc == 0 else []
+    if key == 'dnf_updates':
+        # dnf returns 100 when updates are available
+        ok = rc in (0, 100)
+        return [ln for ln in lines if ln.strip() and not ln.startswith('Last metadata')] if ok else []
+    return [ln for ln in lines if ln.strip()] if rc == 0 else []
+
+
+def package_updates(cmds=None, results=None):
+    updates = {key: [] for key, _ in PKG_MANAGERS}
+    if cmds is None:
+        cmds = package_update_cmds()
+        results = run_all([cmd for _, cmd in cmds])
+    for (key, _), (rc, out, _) in zip(cmds, results):
+        updates[key] = parse_package_updates(key, rc, out)
     return updates
 
 
@@ -91,39 +108,62 @@ def collect_snapshot():
     ts = datetime.now().isoformat()
     snap = {'ts': ts}
 
-    rc, out, _ = run(['ss', '-ltnup'])
-    snap['listeners'] = parse_ss_listeners(out) if rc == 0 else []
-
-    rc, out, _ = run(['sudo', '-n', 'ufw', 'status', 'verbose'])
-    snap['ufw_rules'] = parse_ufw_rules(out) if rc == 0 else []
+    # One concurrent pass over the local probes and every package manager
+    probes = [
+        ['ss', '-ltnup'],
+        ['sudo', '-n', 'ufw', 'status', 'verbose'],
+        ['systemctl', 'list-unit-files', '--type=service'],
+    ]
+    pkg_cmds = package_update_cmds()
+    results = run_all(probes + [cmd for _, cmd in pkg_cmds])
+    (ss_rc, ss_out, _), (ufw_rc, ufw_out, _), (svc_rc, svc_out, _) = results[:len(probes)]
 
-    rc, out, _ = run(['systemctl', 'list-unit-files', '--type=service'])
-    snap['services_interest'] = service_slice(out) if rc == 0 else []
+    snap['listeners'] = parse_ss_listeners(ss_out) if ss_rc == 0 else []
+    snap['ufw_rules'] = parse_ufw_rules(ufw_out) if ufw_rc == 0 else []
+    snap['services_interest'] = service_slice(svc_out) if svc_rc == 0 else []
 
-    snap.update(package_updates())
+    snap.update(package_updates(pkg_cmds, results[len(probes):]))
 
     return snap
 
 
+def dump_json(obj):
+    # Same data either way; orjson keeps non-ASCII as UTF-8 instead of \u escapes
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2).encode()
+
+
+def load_json(path: Path):
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
 def save_snapshot(snap):
-    name = datetime.now().strftime('%Y%m%d-%H%M%S') + '.json'
+    # Sortable prefix for load_latest; %f + pid so back-to-back runs never clash
+    name = datetime.now().strftime('%Y%m%d-%H%M%S-%f') + f'_{os.getpid()}.json'
     path = SNAP / name
-    path.write_text(json.dumps(snap, indent=2))
+    path.write_bytes(dump_json(snap))
     return path
 
 
 def load_latest():
-    files = sorted(SNAP.glob('*.json'))
-    if not files:
+    # Names are timestamps, so the newest is the lexicographic max; no sort or stat needed
+    latest = None
+    with os.scandir(SNAP) as it:
+        for e in it:
+            if e.name.endswith('.json') and (latest is None or e.name > latest):
+                latest = e.name
+    if latest is None:
         return None, None
-    p = files[-1]
-    return p, json.loads(p.read_text())
+    p = SNAP / latest
+    return p, load_json(p)
 
 
 def load_baseline():
     if not BASELINE.exists():
         return None
-    return json.loads(BASELINE.read_text())
+    return load_json(BASELINE)
 
 
 def set_baseline(source='latest'):
@@ -135,23 +175,28 @@ def set_baseline(source='latest'):
         p = Path(source)
         if not p.exists():
             raise SystemExit(f'file not found: {p}')
-        snap = json.loads(p.read_text())
-    BASELINE.write_text(json.dumps(snap, indent=2))
+        snap = load_json(p)
+    BASELINE.write_bytes(dump_json(snap))
     print(f'baseline_set={BASELINE}')
 
 
-def as_set_listeners(snap):
-    return {f"{x.get('proto')}|{x.get('local')}|{x.get('proc')}" for x in snap.get('listeners', [])}
+def listener_keys(snap):
+    return {(x.get('proto'), x.get('local'), x.get('proc')) for x in snap.get('listeners', [])}
+
+
+def fmt_listener(key):
+    return '|'.join(map(str, key))
 
 
 def diff_report(base, cur):
     out = []
     sev = 'INFO'
 
-    b_list = as_set_listeners(base)
-    c_list = as_set_listeners(cur)
-    new_listeners = sorted(c_list - b_list)
-    gone_listeners = sorted(b_list - c_list)
+    # Diff on tuple keys; only the changed listeners are formatted for output
+    b_list = listener_keys(base)
+    c_list = listener_keys(cur)
+    new_listeners = sorted(map(fmt_listener, c_list - b_list))
+    gone_listeners = sorted(map(fmt_listener, b_list - c_list))
 
     b_rules = set(base.get('ufw_rules', []))
     c_rules = set(cur.get('ufw_rules', []))
@@ -7,6 +7,9 @@ import secrets
 import shutil
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
 HOME = Path.home()
@@ -18,6 +21,9 @@ CHUNKS_DIR.mkdir(parents=True, exist_ok=True)
 METADATA_DIR.mkdir(parents=True, exist_ok=True)
 
 CHUNK_SIZE = 4 * 1024 * 1024  # 4MB chunks
+# Shared SSH master so back-to-back syncs skip the TCP+auth handshake
+RSYNC_RSH = 'ssh -o ControlMaster=auto -o ControlPath=~/.ssh/gcp-%r@%h:%p -o ControlPersist=60s'
+CHUNK_WRITE_DEPTH = 8  # chunk writes in flight (bounds buffered data to 8 chunks)
 
 def run(cmd):
     p = subprocess.run(cmd, capture_output=True, text=True)
@@ -27,41 +33,109 @@ def derive_key(passphrase, salt):
     """Derive encryption key from passphrase"""
     return hashlib.pbkdf2_hmac('sha256', passphrase.encode(), salt, 100000)
 
-def encrypt_file(input_path, output_path, passphrase):
-    """Encrypt file using gpg"""
-    # Use gpg for actual encryption
-    rc, _, err = run([
-        'gpg', '--batch', '--yes', '--passphrase', passphrase,
-        '--symmetric', '--cipher-algo', 'AES256',
-        '-o', str(output_path), str(input_path)
-    ])
-    return rc == 0
-
-def decrypt_file(input_path, output_path, passphrase):
-    """Decrypt file using gpg"""
-    rc, _, err = run([
-        'gpg', '--batch', '--yes', '--passphrase', passphrase,
-        '-d', '-o', str(output_path), str(input_path)
-    ])
-    return rc == 0
-
-def split_file(file_path, chunk_size=CHUNK_SIZE):
-    """Split file into chunks"""
+def gpg_cmd(passphrase, *args):
+    """gpg argv reading the passphrase from an inherited pipe; returns (argv, read_fd)"""
+    r, w = os.pipe()
+    os.write(w, passphrase.encode() + b'\n')
+    os.close(w)
+    return ['gpg', '--batch', '--yes', '--passphrase-fd', str(r), *args], r
+
+def feed_plaintext(src, stdin, hasher):
+    """Producer: stream plaintext into gpg while hashing it"""
+    try:
+        with open(src, 'rb') as f:
+            while block := f.read(CHUNK_SIZE):
+                hasher.update(block)
+                stdin.write(block)
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+def encrypt_to_chunks(file_path, passphrase, chunk_size=CHUNK_SIZE):
+    """Encrypt with gpg and write content-addressed chunks in one pass.
+
+    Returns (file_hash, chunks) or (None, None) if gpg fails.
+    """
+    cmd, pass_fd = gpg_cmd(passphrase, '--symmetric', '--cipher-algo', 'AES256')
+    p = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         stderr=subprocess.DEVNULL, pass_fds=(pass_fd,))
+    os.close(pass_fd)
+
+    hasher = hashlib.blake2b(digest_size=32)
+    producer = threading.Thread(target=feed_plaintext, args=(file_path, p.stdin, hasher))
+    producer.start()
+
+    # Chunk writes are handed to a small pool so several are queued to the
+    # device at once while the next chunk is still being read from gpg
+    slots = threading.BoundedSemaphore(CHUNK_WRITE_DEPTH)
+
+    def write_chunk(path, data):
+        try:
+            path.write_bytes(data)
+        finally:
+            slots.release()
+
     chunks = []
-    with open(file_path, 'rb') as f:
-        chunk_num = 0
+    with ThreadPoolExecutor(max_workers=CHUNK_WRITE_DEPTH) as writer:
+        pending = []
         while True:
-            data = f.read(chunk_size)
+            data = p.stdout.read(chunk_size)
             if not data:
                 break
             chunk_hash = hashlib.blake2b(data, digest_size=32).hexdigest()[:16]
+            slots.acquire()
+            pending.append(writer.submit(write_chunk, CHUNKS_DIR / f'{chunk_hash}.chunk', data))
             chunks.append({
-                'num': chunk_num,
+                'num': len(chunks),
                 'hash': chunk_hash,
                 'size': len(data),
             })
-            chunk_num += 1
-    return chunks
+        p.stdout.close()
+        producer.join()
+        for f in pending:
+            f.result()
+    if p.wait() != 0:
+        return None, None
+    return hasher.hexdigest()[:16], chunks
+
+def prefetch(path):
+    """Start kernel readahead on the next chunk while the current one is consumed"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+def decrypt_chunks(chunks, output_path, passphrase):
+    """Stream chunks in order through gpg -d"""
+    cmd, pass_fd = gpg_cmd(passphrase, '-d', '-o', str(output_path))
+    p = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, pass_fds=(pass_fd,))
+    os.close(pass_fd)
+    paths = [CHUNKS_DIR / f'{c["hash"]}.chunk' for c in sorted(chunks, key=lambda c: c['num'])]
+    # One reusable buffer for every chunk instead of a fresh bytes object per read
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    try:
+        for i, path in enumerate(paths):
+            if i + 1 < len(paths):
+                prefetch(paths[i + 1])
+            with open(path, 'rb', buffering=0) as f:
+                while n := f.readinto(buf):
+                    p.stdin.write(view[:n])
+        p.stdin.close()
+    except BrokenPipeError:
+        pass
+    return p.wait() == 0
 
 def store_file(file_path, name=None, passphrase=None):
     """Store file in distributed storage"""
@@ -71,7 +145,6 @@ def store_file(file_path, name=None, passphrase=None):
         return None
     
     name = name or file_path.name
-    file_hash = hashlib.blake2b(file_path.read_bytes(), digest_size=32).hexdigest()[:16]
     
     # Generate encryption key if passphrase provided
     if not passphrase:
@@ -79,31 +152,19 @@ def store_file(file_path, name=None, passphrase=None):
         print(f'generated passphrase: {passphrase}')
         print('SAVE THIS - you need it to recover the file')
     
-    # Encrypt file
-    encrypted = DIST_DIR / f'{file_hash}.gpg'
-    if not encrypt_file(file_path, encrypted, passphrase):
+    # Encrypt, hash and chunk in a single streaming pass
+    file_hash, chunks = encrypt_to_chunks(file_path, passphrase)
+    if file_hash is None:
         print('encryption failed')
         return None
     
-    # Split into chunks
-    chunks = split_file(encrypted)
-    
-    # Store chunks
-    for i, chunk_info in enumerate(chunks):
-        chunk_path = encrypted.with_suffix(f'.chunk{i}')
-        if chunk_path.exists():
-            chunk_data = chunk_path.read_bytes()
-            chunk_file = CHUNKS_DIR / f'{chunk_info["hash"]}.chunk'
-            chunk_file.write_bytes(chunk_data)
-    
     # Save metadata
     metadata = {
         'name': name,
         'original_path': str(file_path),
         'file_hash': file_hash,
-        'encrypted_path': str(encrypted),
         'chunks': chunks,
-        'created': subprocess.datetime.now().isoformat(),
+        'created': datetime.now().isoformat(),
     }
     
     meta_file = METADATA_DIR / f'{file_hash}.json'
@@ -124,10 +185,10 @@ def retrieve_file(file_hash, output_path, passphrase):
         return False
     
     metadata = json.loads(meta_file.read_text())
-    encrypted = DIST_DIR / f'{file_hash}.gpg'
+    missing = [c['hash'] for c in metadata['chunks'] if not (CHUNKS_DIR / f'{c["hash"]}.chunk').exists()]
     
-    if not encrypted.exists():
-        print(f'encrypted file not found locally: {file_hash}')
+    if missing:
+        print(f'{len(missing)} chunk(s) not found locally: {file_hash}')
         print('searching on mesh nodes...')
         # Would search mesh nodes here
         return False
@@ -136,7 +197,8 @@ def retrieve_file(file_hash, output_path, passphrase):
     decrypted = tempfile.NamedTemporaryFile(delete=False)
     decrypted.close()
     
-    if not decrypt_file(encrypted, decrypted.name, passphrase):
+    if not decrypt_chunks(metadata['chunks'], decrypted.name, passphrase):
+        os.unlink(decrypted.name)
         print('decryption failed - wrong passphrase?')
         return False
     
@@ -163,22 +225,38 @@ def sync_to_node(node_name, file_hash=None):
     
     if file_hash:
         # Sync specific file
-        files = [DIST_DIR / f'{file_hash}.gpg']
+        metas = [METADATA_DIR / f'{file_hash}.json']
     else:
         # Sync all
-        files = list(DIST_DIR.glob('*.gpg'))
-    
-    for f in files:
-        print(f'syncing {f.name} to {node_name}...')
-        rc, _, err = run([
-            'rsync', '-avz', '--progress',
-            str(f),
-            f'{user}@{host}:~/.local/share/ghost-control-plane/distributed/'
-        ])
-        if rc == 0:
-            print(f'  ✓ synced')
-        else:
-            print(f'  ✗ failed: {err}')
+        metas = sorted(METADATA_DIR.glob('*.json'))
+    
+    files = []
+    for meta in metas:
+        if not meta.exists():
+            print(f'metadata not found: {meta.stem}')
+            continue
+        files.append(meta)
+        for c in json.loads(meta.read_text())['chunks']:
+            files.append(CHUNKS_DIR / f'{c["hash"]}.chunk')
+    
+    if not files:
+        print('nothing to sync')
+        return
+    
+    # One rsync (one SSH handshake) for every file; --files-from keeps the
+    # chunks/ and metadata/ layout and avoids argv length limits
+    print(f'syncing {len(files)} file(s) to {node_name}...')
+    env = dict(os.environ, RSYNC_RSH=RSYNC_RSH)
+    p = subprocess.run([
+        'rsync', '-avz', '--progress', '--files-from=-',
+        f'{DIST_DIR}/',
+        f'{user}@{host}:~/.local/share/ghost-control-plane/distributed/'
+    ], input='\n'.join(str(f.relative_to(DIST_DIR)) for f in files) + '\n',
+        capture_output=True, text=True, env=env)
+    if p.returncode == 0:
+        print(f'  ✓ synced')
+    else:
+        print(f'  ✗ failed: {(p.stderr or "").strip()}')
 
 def list_storage():
     """List stored files"""
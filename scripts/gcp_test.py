@@ -1,51 +1,217 @@
 #!/usr/bin/env python3
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import runpy
+import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
-TESTS = [
-    ('checkpoint list', ['python', str(ROOT / 'scripts' / 'gcp_checkpoint.py'), '--list']),
-    ('scene list', ['python', str(ROOT / 'scripts' / 'gcp_scene.py'), '--list']),
-    ('guard status', ['python', str(ROOT / 'scripts' / 'gcp_guard.py')]),
-    ('soc report', ['python', str(ROOT / 'scripts' / 'gcp_soc.py'), '--report']),
-    ('profile status', ['bash', '-c', 'powerprofilesctl get 2>/dev/null || echo performance']),
-    ('autopilot status', ['systemctl', '--user', 'is-active', 'gcp-autopilot.timer']),
-    ('backup config', ['python', str(ROOT / 'scripts' / 'gcp_backup.py'), 'status']),
-    ('audio status', ['python', str(ROOT / 'scripts' / 'gcp_audio.py'), 'status']),
-    ('network status', ['python', str(ROOT / 'scripts' / 'gcp_network.py'), 'status']),
-    ('qos status', ['python', str(ROOT / 'scripts' / 'gcp_qos.py'), 'status']),
-    ('cache status', ['python', str(ROOT / 'scripts' / 'gcp_cache.py'), 'status']),
-    ('dashboard dry-run', ['python', str(ROOT / 'scripts' / 'gcp_dashboard.py')]),
-    ('cognition detect', ['python', str(ROOT / 'scripts' / 'gcp_cognition.py'), 'detect']),
-]
-
-def run_test(name, cmd):
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    if p.returncode == 0:
-        print(f'✓ {name}')
+SCRIPTS = ROOT / 'scripts'
+STDERR_HEAD = 100  # chars of a failing test's stderr that get printed
+# (name, script, argv): gcp_*.py scripts run in-process; script=None runs argv as a command
+TESTS = (
+    ('checkpoint list', 'gcp_checkpoint.py', ('--list',)),
+    ('scene list', 'gcp_scene.py', ('--list',)),
+    ('guard status', 'gcp_guard.py', ()),
+    ('soc report', 'gcp_soc.py', ('--report',)),
+    ('profile status', None, ('bash', '-c', 'powerprofilesctl get 2>/dev/null || echo performance')),
+    ('autopilot status', None, ('systemctl', '--user', 'is-active', 'gcp-autopilot.timer')),
+    ('backup config', 'gcp_backup.py', ('status',)),
+    ('audio status', 'gcp_audio.py', ('status',)),
+    ('network status', 'gcp_network.py', ('status',)),
+    ('qos status', 'gcp_qos.py', ('status',)),
+    ('cache status', 'gcp_cache.py', ('status',)),
+    ('dashboard dry-run', 'gcp_dashboard.py', ()),
+    ('cognition detect', 'gcp_cognition.py', ('detect',)),
+)
+
+# sys.argv and the stdout/stderr redirects are process-wide, so in-process
+# scripts run one at a time; external commands still overlap with them
+_INPROC_LOCK = threading.Lock()
+
+class _HeadWriter(io.TextIOBase):
+    """Text sink that keeps only the first `limit` chars written (0 discards all)"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.head = ''
+
+    def writable(self):
         return True
+
+    def write(self, s):
+        if len(self.head) < self.limit:
+            self.head += s[:self.limit - len(self.head)]
+        return len(s)
+
+    def getvalue(self):
+        return self.head
+
+def run_script(script, argv):
+    """Run a gcp_*.py script as __main__ in this interpreter; returns (rc, stderr)
+
+    stdout is discarded and only the first STDERR_HEAD chars of stderr are
+    kept (all that report() prints), so chatty scripts use bounded memory.
+    """
+    path = str(SCRIPTS / script)
+    err = _HeadWriter(STDERR_HEAD)
+    with _INPROC_LOCK:
+        saved_argv = sys.argv
+        sys.argv = [path, *argv]
+        try:
+            with contextlib.redirect_stdout(_HeadWriter(0)), contextlib.redirect_stderr(err):
+                try:
+                    runpy.run_path(path, run_name='__main__')
+                    rc = 0
+                except SystemExit as e:
+                    if e.code is None or isinstance(e.code, int):
+                        rc = e.code or 0
+                    else:
+                        print(e.code, file=sys.stderr)
+                        rc = 1
+                except Exception as e:
+                    print(f'{type(e).__name__}: {e}', file=sys.stderr)
+                    rc = 1
+        finally:
+            sys.argv = saved_argv
+    return rc, err.getvalue()
+
+def report(name, rc, stderr):
+    """(ok, lines) for one test; lines are printed later, in TESTS order"""
+    if rc == 0:
+        return True, [f'✓ {name}']
+    lines = [f'✗ {name}']
+    if stderr:
+        lines.append(f'  {stderr[:STDERR_HEAD]}')
+    return False, lines
+
+# Child processes in flight, so --fail-fast can terminate them
+_RUNNING = set()
+_RUNNING_LOCK = threading.Lock()
+_STOP = threading.Event()
+
+@functools.lru_cache(maxsize=None)
+def which(cmd):
+    return cmd if os.path.isabs(cmd) else shutil.which(cmd)
+
+def run_child(argv, stderr_head=None):
+    """subprocess.run equivalent that --fail-fast can cancel; returns (rc, stdout, stderr)
+
+    stderr_head: discard stdout and keep only the first N chars of stderr
+    (all that report() prints), so chatty children use bounded memory.
+    """
+    exe = which(argv[0])
+    if exe is None:
+        return 127, '', f'{argv[0]}: command not found'
+    with _RUNNING_LOCK:
+        if _STOP.is_set():
+            return -1, '', 'cancelled'
+        # Absolute path + close_fds=False lets subprocess use posix_spawn (vfork)
+        # instead of fork; our own fds are non-inheritable (PEP 446) anyway
+        p = subprocess.Popen([exe, *argv[1:]], text=True, close_fds=False, stderr=subprocess.PIPE,
+                             stdout=subprocess.PIPE if stderr_head is None else subprocess.DEVNULL)
+        _RUNNING.add(p)
+    try:
+        if stderr_head is None:
+            out, err = p.communicate()
+        else:
+            out, err = '', ''
+            # Keep reading past the limit so the child never blocks on a full pipe
+            while chunk := p.stderr.read(4096):
+                if len(err) < stderr_head:
+                    err += chunk[:stderr_head - len(err)]
+            p.stderr.close()
+            p.wait()
+    finally:
+        with _RUNNING_LOCK:
+            _RUNNING.discard(p)
+    return p.returncode, out, err
+
+def stop_running():
+    with _RUNNING_LOCK:
+        _STOP.set()
+        for p in _RUNNING:
+            p.terminate()
+
+def run_test(name, script, argv):
+    """{name: (ok, lines)}"""
+    if script:
+        rc, stderr = run_script(script, argv)
     else:
-        print(f'✗ {name}')
-        if p.stderr:
-            print(f'  {p.stderr[:100]}')
-        return False
+        rc, _, stderr = run_child(argv, stderr_head=STDERR_HEAD)
+    return {name: report(name, rc, stderr)}
+
+def run_batch(tests):
+    """Run script tests in one child interpreter via _gcp_run_batch.py; {name: (ok, lines)}"""
+    rc, out, err = run_child([sys.executable, str(SCRIPTS / '_gcp_run_batch.py'), json.dumps(tests)])
+    results = {}
+    for ln in out.splitlines():
+        try:
+            r = json.loads(ln)
+            results[r['name']] = report(r['name'], r['rc'], r['stderr'])
+        except (ValueError, KeyError, TypeError):
+            continue
+    # Anything without a result line died with the batch child
+    for name, _, _ in tests:
+        results.setdefault(name, report(name, rc or 1, err))
+    return results
 
 def main():
+    parser = argparse.ArgumentParser(description='GCP integration test suite')
+    parser.add_argument('--jobs', '-j', type=int, default=max(1, (os.cpu_count() or 1) - 2),
+                        help='tests to run concurrently (1 = serial)')
+    parser.add_argument('--isolated', action='store_true',
+                        help='run gcp_*.py tests in one child interpreter instead of in-process')
+    parser.add_argument('--fail-fast', '-x', action='store_true',
+                        help='stop at the first failure; pending tests are skipped')
+    args = parser.parse_args()
+
     print('== GCP Integration Test Suite ==')
     print()
     
     passed = 0
     failed = 0
+    skipped = 0
     
-    for name, cmd in TESTS:
-        if run_test(name, cmd):
+    # Tests are independent and mostly wait on child processes, so threads are
+    # enough. Results are printed only once all are done: an in-process test
+    # may have stdout redirected while it runs.
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as ex:
+        if args.isolated:
+            futures = [ex.submit(run_batch, [t for t in TESTS if t[1]])]
+            futures += [ex.submit(run_test, *t) for t in TESTS if not t[1]]
+        else:
+            futures = [ex.submit(run_test, *t) for t in TESTS]
+        for f in as_completed(futures):
+            res = f.result()
+            results.update(res)
+            if args.fail_fast and not all(ok for ok, _ in res.values()):
+                ex.shutdown(wait=False, cancel_futures=True)
+                stop_running()
+                break
+    for name, _, _ in TESTS:
+        if name not in results:
+            print(f'- {name} (skipped)')
+            skipped += 1
+            continue
+        ok, lines = results[name]
+        print('\n'.join(lines))
+        if ok:
             passed += 1
         else:
             failed += 1
     
     print()
-    print(f'Results: {passed} passed, {failed} failed')
+    print(f'Results: {passed} passed, {failed} failed' + (f', {skipped} skipped' if skipped else ''))
     
     if failed > 0:
         print('\nSome tests failed. Check individual components.')
@@ -1,53 +1,177 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import functools
 import json
+import os
+import re
 import subprocess
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
 HOME = Path.home()
 ROOT = Path(__file__).resolve().parent.parent
 BASE = HOME / '.local' / 'share' / 'ghost-control-plane'
+LS_REMOTE_CACHE = BASE / 'cache' / 'ls-remote.json'
+LS_REMOTE_TTL = 1800  # seconds
+CHECKPOINTS = BASE / 'checkpoints'
+BACKUP_SKIP_WINDOW = 24 * 3600  # skip pre-update backup if clean + checkpoint this recent
 
 def run(cmd, cwd=None):
     p = subprocess.run(cmd, capture_output=True, text=True, cwd=cwd)
     return p.returncode, (p.stdout or '').strip(), (p.stderr or '').strip()
 
+_GIT_BATCH = None
+
+def git_resolve(rev):
+    """Object name for rev via one long-lived `git cat-file --batch-check`, or None"""
+    global _GIT_BATCH
+    if _GIT_BATCH is None or _GIT_BATCH.poll() is not None:
+        _GIT_BATCH = subprocess.Popen(['git', 'cat-file', '--batch-check'], cwd=ROOT, text=True, bufsize=1,
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        _GIT_BATCH.stdin.write(rev + '\n')
+        _GIT_BATCH.stdin.flush()
+        parts = _GIT_BATCH.stdout.readline().split()
+    except (BrokenPipeError, ValueError):
+        return None
+    # "<sha> <type> <size>" or "<rev> missing"
+    return parts[0] if len(parts) == 3 else None
+
+@atexit.register
+def _close_git_batch():
+    if _GIT_BATCH is not None and _GIT_BATCH.poll() is None:
+        _GIT_BATCH.stdin.close()
+        _GIT_BATCH.wait()
+
+SHA_RE = re.compile(r'[0-9a-f]{40}|[0-9a-f]{64}')
+
+def read_head():
+    """HEAD sha straight from .git (loose ref or packed-refs), or None to ask git"""
+    git_dir = ROOT / '.git'
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+        if not head.startswith('ref: '):
+            return head if SHA_RE.fullmatch(head) else None
+        ref = head[5:]
+        loose = git_dir / ref
+        if loose.is_file():
+            sha = loose.read_text().strip()
+            return sha if SHA_RE.fullmatch(sha) else None
+        with open(git_dir / 'packed-refs') as f:
+            for ln in f:
+                sha, _, name = ln.rstrip('\n').partition(' ')
+                if name == ref and SHA_RE.fullmatch(sha):
+                    return sha
+    except OSError:  # .git is a file (worktree/submodule), missing, ...
+        pass
+    return None
+
+@functools.lru_cache(maxsize=1)
 def get_latest_commit():
-    rc, out, _ = run(['git', 'rev-parse', 'HEAD'], cwd=ROOT)
-    return out if rc == 0 else None
+    return read_head() or git_resolve('HEAD')
+
+def tree_clean():
+    rc, out, _ = run(['git', 'status', '--porcelain'], cwd=ROOT)
+    return rc == 0 and not out
 
-def get_remote_commit():
-    rc, out, _ = run(['git', 'ls-remote', 'origin', 'HEAD'], cwd=ROOT)
-    if rc == 0:
-        return out.split()[0] if out else None
+def newest_checkpoint_age():
+    """Seconds since the newest checkpoint was written, or None"""
+    try:
+        with os.scandir(CHECKPOINTS) as it:
+            newest = max((e.stat().st_mtime for e in it if e.is_file()), default=None)
+    except FileNotFoundError:
+        return None
+    return None if newest is None else time.time() - newest
+
+def read_remote_cache():
+    """(refs, ts) from the ls-remote cache, or (None, 0)"""
+    try:
+        data = json.loads(LS_REMOTE_CACHE.read_text())
+        return dict(data['refs']), float(data['ts'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, 0
+
+def write_remote_cache(refs):
+    LS_REMOTE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    LS_REMOTE_CACHE.write_text(json.dumps({'refs': refs, 'ts': time.time()}))
+
+def invalidate_remote_cache():
+    LS_REMOTE_CACHE.unlink(missing_ok=True)
+    get_remote_refs.cache_clear()
+
+def cached_remote_refs(cache='ttl'):
+    """Remote refs from the ls-remote cache. cache: 'ttl' (if fresh), 'first' (any age), 'off'"""
+    if cache == 'off':
+        return None
+    refs, ts = read_remote_cache()
+    if refs and (cache == 'first' or time.time() - ts < LS_REMOTE_TTL):
+        return refs
     return None
 
-def status():
+def start_ls_remote():
+    # Every ref in one call (HEAD, branches, tags) so later lookups need no network
+    return subprocess.Popen(['git', 'ls-remote', 'origin'], cwd=ROOT,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+def finish_ls_remote(p):
+    """{ref: sha} from a start_ls_remote() process, or None"""
+    out, _ = p.communicate()
+    if p.returncode != 0:
+        return None
+    refs = {}
+    for ln in out.splitlines():
+        sha, _, ref = ln.partition('\t')
+        if ref:
+            refs[ref] = sha
+    if not refs:
+        return None
+    write_remote_cache(refs)
+    return refs
+
+@functools.lru_cache(maxsize=1)
+def get_remote_refs(cache='ttl'):
+    """{ref: sha} for origin, from the cache when allowed"""
+    refs = cached_remote_refs(cache)
+    if refs:
+        return refs
+    # ls-remote is network-bound: resolve (and memoize) local HEAD meanwhile
+    proc = start_ls_remote()
+    get_latest_commit()
+    return finish_ls_remote(proc)
+
+def get_remote_commit(cache='ttl'):
+    return (get_remote_refs(cache) or {}).get('HEAD')
+
+def status(cache='ttl', sha=None):
+    """Print local vs remote; returns (rc, local, remote)
+
+    sha: remote commit already known to the caller; skips the remote lookup.
+    """
+    remote = sha or get_remote_commit(cache)
     local = get_latest_commit()
-    remote = get_remote_commit()
     
     print(f'local:  {local[:12] if local else "unknown"}')
     print(f'remote: {remote[:12] if remote else "unknown"}')
     
     if not local or not remote:
         print('status: error checking versions')
-        return 1
+        return 1, local, remote
     
     if local == remote:
         print('status: up to date')
-        return 0
+        return 0, local, remote
     else:
         print('status: update available')
-        return 1
+        return 1, local, remote
 
-def update():
+def update(cache='off'):
     print('== GCP Self-Update ==')
     
-    # Check for updates
-    local = get_latest_commit()
-    remote = get_remote_commit()
+    # Check for updates (fresh by default: a stale cache would hide the update)
+    rc, local, remote = status(cache)
     
     if not local or not remote:
         print('error: cannot check versions')
@@ -59,6 +183,10 @@ def update():
     
     print(f'update available: {local[:12]} -> {remote[:12]}')
     
+    # Decided before step 1, which writes a fresh checkpoint of its own
+    age = newest_checkpoint_age()
+    skip_backup = age is not None and age < BACKUP_SKIP_WINDOW and tree_clean()
+    
     # Pre-update checkpoint
     print('\n[1/4] Creating checkpoint...')
     checkpoint = BASE / 'checkpoints' / f'{datetime.now():%Y%m%d-%H%M%S}-pre-update.json'
@@ -70,11 +198,14 @@ def update():
     
     # Backup current state
     print('\n[2/4] Running backup...')
-    rc, out, _ = run(['python', str(ROOT / 'scripts' / 'gcp_backup.py'), 'run', '--apply'])
-    if rc != 0:
-        print('backup failed, aborting')
-        return 1
-    print('backup complete')
+    if skip_backup:
+        print(f'skipped: working tree clean and last checkpoint {age / 3600:.1f}h old')
+    else:
+        rc, out, _ = run(['python', str(ROOT / 'scripts' / 'gcp_backup.py'), 'run', '--apply'])
+        if rc != 0:
+            print('backup failed, aborting')
+            return 1
+        print('backup complete')
     
     # Pull update
     print('\n[3/4] Pulling updates...')
@@ -84,6 +215,8 @@ def update():
         print('attempting rollback...')
         # Could restore from checkpoint here
         return 1
+    invalidate_remote_cache()
+    get_latest_commit.cache_clear()
     print(out)
     
     # Verify installation
@@ -97,25 +230,43 @@ def update():
     print('\nupdate complete and verified')
     return 0
 
-def check():
-    rc = status()
+def check(cache='ttl', sha=None):
+    rc, _, _ = status(cache, sha)
     if rc != 0:
         print('\nrun "gcp update" to apply')
     return rc
 
+cache_opts = argparse.ArgumentParser(add_help=False)
+cache_mode = cache_opts.add_mutually_exclusive_group()
+cache_mode.add_argument('--no-cache', dest='cache', action='store_const', const='off',
+                        help='always query the remote (ignore the ls-remote cache)')
+cache_mode.add_argument('--cache-first', dest='cache', action='store_const', const='first',
+                        help=f'use any cached remote sha, even older than {LS_REMOTE_TTL}s')
+
+def full_sha(value):
+    value = value.lower()
+    if not re.fullmatch(r'[0-9a-f]{40}', value):
+        raise argparse.ArgumentTypeError('expected a full 40-character commit sha')
+    return value
+
+sha_opts = argparse.ArgumentParser(add_help=False)
+sha_opts.add_argument('--sha', type=full_sha, help='known remote commit (skips ls-remote)')
+
 parser = argparse.ArgumentParser(description='GCP self-updater')
 sub = parser.add_subparsers(dest='cmd')
-sub.add_parser('status', help='check update status')
-sub.add_parser('check', help='check and notify if update available')
-sub.add_parser('update', help='backup, update, and verify')
+sub.add_parser('status', parents=[cache_opts, sha_opts], help='check update status')
+sub.add_parser('check', parents=[cache_opts, sha_opts], help='check and notify if update available')
+sub.add_parser('update', parents=[cache_opts], help='backup, update, and verify')
 args = parser.parse_args()
+cache = {'cache': args.cache} if getattr(args, 'cache', None) else {}
+sha = getattr(args, 'sha', None)
 
 if args.cmd == 'status':
-    sys.exit(status())
+    sys.exit(status(**cache, sha=sha)[0])
 elif args.cmd == 'check':
-    sys.exit(check())
+    sys.exit(check(**cache, sha=sha))
 elif args.cmd == 'update':
-    sys.exit(update())
+    sys.exit(update(**cache))
 else:
     parser.print_help()
     sys.exit(1)
@@ -4,11 +4,23 @@ Ghost Control Plane - VPS Provisioner
 Automated setup for new GCP mesh nodes
 """
 import argparse
+import hashlib
 import json
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# One multiplexed SSH connection per host: the first call authenticates and the
+# rest of provisioning (and later gcp_storage rsyncs) reuse the master socket
+SSH_OPTS = ['-o', 'ControlMaster=auto', '-o', 'ControlPath=~/.ssh/gcp-%r@%h:%p', '-o', 'ControlPersist=600s']
+SSH_DIR = Path.home() / '.ssh'
+MAX_PARALLEL_PROVISION = 8
+# Serializes the interactive/local-file parts of parallel provisioning
+_SETUP_LOCK = threading.Lock()
+SSH_CONFIG_GCP = SSH_DIR / 'config.d' / 'gcp'
+
 # Bootstrap script that gets run on the remote VPS
 BOOTSTRAP_SCRIPT = '''#!/bin/bash
 set -e
@@ -106,9 +118,35 @@ echo "Add this node to your mesh with:"
 echo "  gcp mesh-sync add <name> <this-ip> --user ghost"
 '''
 
-def run(cmd, check=True):
-    """Run shell command"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+BOOTSTRAP_SHA256 = hashlib.sha256(BOOTSTRAP_SCRIPT.encode()).hexdigest()
+# Root-owned location: an unprivileged user on the VPS must not be able to
+# plant a matching marker and make a re-provision skip the hardening steps
+BOOTSTRAP_MARKER = '/var/lib/gcp/bootstrap.sha256'
+
+def bootstrap_payload():
+    """Bootstrap for `bash -s`, skipped if this exact script already completed on the host"""
+    # The { } group makes bash read the whole script before running any of it,
+    # so commands that read stdin (apt, su) can't swallow the rest. set -e in
+    # the script means the marker is only written after a full, clean run.
+    # "gcp-bootstrap:" lines are the result reported back to the operator.
+    return (f'if [ "$(stat -c %u {BOOTSTRAP_MARKER} 2>/dev/null)" = 0 ] && '
+            f'[ "$(cat {BOOTSTRAP_MARKER})" = "{BOOTSTRAP_SHA256}" ]; then\n'
+            f'    echo "gcp-bootstrap: unchanged ({BOOTSTRAP_SHA256[:12]}), already applied - skipped"\n'
+            '    exit 0\n'
+            'fi\n'
+            '{\n' + BOOTSTRAP_SCRIPT + '\n}\n'
+            f'mkdir -p {BOOTSTRAP_MARKER.rsplit("/", 1)[0]}\n'
+            f'echo {BOOTSTRAP_SHA256} > {BOOTSTRAP_MARKER}\n'
+            f'echo "gcp-bootstrap: applied ({BOOTSTRAP_SHA256[:12]})"\n')
+
+def run(cmd, check=True, input=None):
+    """Run command (argv list, no shell)"""
+    try:
+        result = subprocess.run(cmd, input=input, capture_output=True, text=True)
+    except FileNotFoundError:
+        if check:
+            print(f"Error: {cmd[0]}: command not found")
+        return None
     if check and result.returncode != 0:
         print(f"Error: {result.stderr}")
         return None
@@ -119,61 +157,123 @@ def generate_ssh_key():
     key_path = Path.home() / '.ssh' / 'gcp_vps_key'
     if not key_path.exists():
         print("Generating SSH key for VPS access...")
-        run(f'ssh-keygen -t ed25519 -f {key_path} -N "" -C "gcp-vps"')
+        run(['ssh-keygen', '-t', 'ed25519', '-f', str(key_path), '-N', '', '-C', 'gcp-vps'])
         print(f"Key generated: {key_path}")
     return key_path
 
-def provision_vps(ip, user='root', ssh_key=None, provider='generic'):
-    """Provision a new VPS with GCP"""
-    print(f"Provisioning VPS at {ip}...")
-    print(f"Provider: {provider}")
-    print()
+def write_ssh_config(ip, key_path):
+    """Add a multiplexing Host entry so later mesh-sync/storage SSH reuses the connection"""
+    SSH_CONFIG_GCP.parent.mkdir(parents=True, exist_ok=True)
+    entry = (f'Host {ip}\n'
+             '  ControlMaster auto\n'
+             '  ControlPath ~/.ssh/gcp-%r@%h:%p\n'
+             '  ControlPersist 10m\n'
+             f'  IdentityFile {key_path}\n')
+    # Replace any previous entry for this host, keep the others
+    blocks = SSH_CONFIG_GCP.read_text().split('\n\n') if SSH_CONFIG_GCP.exists() else []
+    blocks = [b.strip('\n') + '\n' for b in blocks if b.strip() and b.split('\n', 1)[0] != f'Host {ip}']
+    SSH_CONFIG_GCP.write_text('\n'.join(blocks + [entry]))
+    SSH_CONFIG_GCP.chmod(0o600)
+
+    # Include must come before any Host block to apply globally
+    config = SSH_DIR / 'config'
+    include = 'Include config.d/gcp'
+    current = config.read_text() if config.exists() else ''
+    if include not in current.splitlines():
+        config.write_text(f'{include}\n\n{current}' if current else f'{include}\n')
+        config.chmod(0o600)
+
+class ProvisionError(RuntimeError):
+    pass
+
+def add_to_mesh(ip, node_name):
+    if node_name:
+        run(['gcp', 'mesh-sync', 'add', node_name, ip, '--user', 'ghost'], check=False)
+
+def provision_vps(ip, user='root', ssh_key=None, provider='generic', name=None, tag=False):
+    """Provision a new VPS with GCP; returns the node name (None if not added to the mesh)
+
+    tag: prefix output with the IP (several hosts provisioning at once).
+    Raises ProvisionError if key setup or the bootstrap fails.
+    """
+    # One write per line so lines from concurrent hosts don't splice together
+    say = (lambda msg='': print(f'[{ip}] {msg}\n' if msg else '\n', end='', flush=True)) if tag else print
+    say(f"Provisioning VPS at {ip}...")
+    say(f"Provider: {provider}")
+    say()
     
     # Generate SSH key if needed
-    key_path = generate_ssh_key()
+    with _SETUP_LOCK:
+        key_path = generate_ssh_key()
     pub_key = f"{key_path}.pub"
     
-    # Copy SSH key to VPS
-    print("[1/3] Setting up SSH access...")
-    if ssh_key:
-        run(f'ssh-copy-id -i {ssh_key} {user}@{ip}')
-    else:
-        # Try password auth first, then key
-        run(f'ssh-copy-id -i {pub_key} {user}@{ip}')
-    
-    # Upload and run bootstrap script
-    print("[2/3] Uploading bootstrap script...")
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.sh', delete=False) as f:
-        f.write(BOOTSTRAP_SCRIPT)
-        bootstrap_path = f.name
+    # Copy SSH key to VPS. One host at a time: ssh-copy-id may prompt for a
+    # password on the terminal.
+    say("[1/3] Setting up SSH access...")
+    with _SETUP_LOCK:
+        if ssh_key:
+            out = run(['ssh-copy-id', '-i', str(ssh_key), *SSH_OPTS, f'{user}@{ip}'])
+        else:
+            # Try password auth first, then key
+            out = run(['ssh-copy-id', '-i', pub_key, *SSH_OPTS, f'{user}@{ip}'])
+    if out is None:
+        raise ProvisionError('SSH key setup failed')
     
-    run(f'scp -i {key_path} {bootstrap_path} {user}@{ip}:/tmp/gcp-bootstrap.sh')
-    run(f'ssh -i {key_path} {user}@{ip} "chmod +x /tmp/gcp-bootstrap.sh && /tmp/gcp-bootstrap.sh"')
+    # Pipe the bootstrap into a remote `bash -s`: one SSH session, no temp file
+    say("[2/3] Running bootstrap script...")
+    out = run(['ssh', '-i', str(key_path), *SSH_OPTS, f'{user}@{ip}', 'bash -s'], input=bootstrap_payload())
+    if out is None:
+        raise ProvisionError('bootstrap failed')
+    for ln in out.splitlines():
+        if ln.startswith('gcp-bootstrap:'):
+            say(ln)
     
-    # Clean up
-    Path(bootstrap_path).unlink(missing_ok=True)
+    # Only reached once key setup and bootstrap succeeded: never leave a Host
+    # entry behind for a node that isn't actually provisioned
+    with _SETUP_LOCK:
+        write_ssh_config(ip, key_path)
     
-    print("[3/3] Adding to local mesh...")
-    node_name = input("Name for this node (e.g., 'vps-hetzner'): ").strip()
-    if node_name:
-        run(f'gcp mesh-sync add {node_name} {ip} --user ghost', check=False)
+    say("[3/3] Adding to local mesh...")
+    node_name = name if name is not None else input("Name for this node (e.g., 'vps-hetzner'): ").strip()
+    add_to_mesh(ip, node_name)
     
-    print()
-    print("=== VPS Provisioned ===")
-    print(f"IP: {ip}")
-    print(f"User: ghost")
-    print(f"SSH: ssh -i {key_path} ghost@{ip}")
-    print()
-    print("Next steps:")
-    print("  1. Test: gcp mesh-sync status")
-    print("  2. Sync: gcp mesh-sync sync 'status' --target {node_name}")
-    print("  3. Backup target: configure in gcp backup")
+    say()
+    say("=== VPS Provisioned ===")
+    say(f"IP: {ip}")
+    say(f"User: ghost")
+    say(f"SSH: ssh -i {key_path} ghost@{ip}")
+    say(f"SSH config: {SSH_CONFIG_GCP}")
+    say()
+    say("Next steps:")
+    say("  1. Test: gcp mesh-sync status")
+    say("  2. Sync: gcp mesh-sync sync 'status' --target {node_name}")
+    say("  3. Backup target: configure in gcp backup")
+    return node_name or None
+
+def provision_many(ips, user='root', ssh_key=None, provider='generic', names=()):
+    """Provision several hosts concurrently; bootstrap (apt upgrade etc.) dominates and is remote"""
+    names = list(names) + [''] * (len(ips) - len(names))
+    with ThreadPoolExecutor(max_workers=min(len(ips), MAX_PARALLEL_PROVISION)) as ex:
+        futures = {ip: ex.submit(provision_vps, ip, user, ssh_key, provider, name, True)
+                   for ip, name in zip(ips, names)}
+    failed = []
+    for ip, f in futures.items():
+        try:
+            node_name = f.result()
+        except Exception as e:
+            print(f'[{ip}] failed: {e}')
+            failed.append(ip)
+            continue
+        if not node_name:
+            # Prompts stay on the main thread, one host at a time
+            add_to_mesh(ip, input(f"Name for node {ip} (e.g., 'vps-hetzner'): ").strip())
+    return failed
 
 def test_connection(ip, user='ghost', ssh_key=None):
     """Test SSH connection to VPS"""
     key_path = ssh_key or Path.home() / '.ssh' / 'gcp_vps_key'
     result = subprocess.run(
-        ['ssh', '-i', str(key_path), '-o', 'ConnectTimeout=5', 
+        ['ssh', '-i', str(key_path), *SSH_OPTS, '-o', 'ConnectTimeout=5', 
          '-o', 'BatchMode=yes', f'{user}@{ip}', 'echo', 'ok'],
         capture_output=True
     )
@@ -181,24 +281,36 @@ def test_connection(ip, user='ghost', ssh_key=None):
 
 def main():
     parser = argparse.ArgumentParser(description='Provision VPS with Ghost Control Plane')
-    parser.add_argument('ip', help='VPS IP address')
+    parser.add_argument('ip', nargs='+', help='VPS IP address(es); several are provisioned in parallel')
     parser.add_argument('--user', default='root', help='Initial SSH user (default: root)')
     parser.add_argument('--ssh-key', help='Path to SSH private key')
     parser.add_argument('--provider', default='generic', 
                        choices=['generic', 'hetzner', 'vultr', 'digitalocean', 'linode'],
                        help='VPS provider (for provider-specific tweaks)')
+    parser.add_argument('--name', action='append', default=[],
+                        help='mesh node name, once per IP in order (skips the prompt)')
     parser.add_argument('--test', action='store_true', help='Test connection only')
     
     args = parser.parse_args()
+    if len(args.name) > len(args.ip):
+        parser.error('more --name values than IPs')
     
     if args.test:
-        if test_connection(args.ip, args.user, args.ssh_key):
-            print(f"Connection to {args.ip} successful")
-        else:
-            print(f"Cannot connect to {args.ip}")
+        failed = [ip for ip in args.ip if not test_connection(ip, args.user, args.ssh_key)]
+        for ip in args.ip:
+            print(f"Cannot connect to {ip}" if ip in failed else f"Connection to {ip} successful")
+        if failed:
+            sys.exit(1)
+    elif len(args.ip) == 1:
+        try:
+            provision_vps(args.ip[0], args.user, args.ssh_key, args.provider,
+                          name=args.name[0] if args.name else None)
+        except ProvisionError as e:
+            print(f"Provisioning {args.ip[0]} failed: {e}")
             sys.exit(1)
     else:
-        provision_vps(args.ip, args.user, args.ssh_key, args.provider)
+        if provision_many(args.ip, args.user, args.ssh_key, args.provider, args.name):
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()